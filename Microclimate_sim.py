@@ -1,21 +1,30 @@
 """
 Проста симуляція вбудованої системи контролю мікроклімату.
-- Працює на стандартній бібліотеці
+- Працює на стандартній бібліотеці (uvloop використовується, якщо встановлено)
 - Асинхронні сенсори + контролер + логування в CSV
 - Локальний інтерфейс
 """
 
 import asyncio
-import csv
 import datetime
+import hashlib
+import inspect
 import math
+import os
 import random
+import sys
 import threading
+import time
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 SENSOR_PERIOD = 1.0
-CONTROL_PERIOD = 1.0
 LOG_PERIOD = 5.0
 DEFAULT_SETPOINTS = {
     "temperature": 22.0,
@@ -28,22 +37,121 @@ HYSTERESIS = {
     "co2": 50.0
 }
 CSV_LOGFILE = "microclimate_log.csv"
+# скільки рядків шуму генерувати за раз (при наявності numpy)
+NOISE_CHUNK = 256
+
+
+def _iov_max() -> int:
+    # ліміт буферів на один writev; якщо система його не повідомляє -- мінімум POSIX (16)
+    try:
+        n = os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        n = -1
+    return n if n > 0 else 16
+
+
+IOV_MAX = _iov_max()
+
+# біти маски виконавчих механізмів
+HEATER = 1
+COOLER = 2
+HUMIDIFIER = 4
+FAN = 8
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
 
+def _iso_utc(ns: int) -> str:
+    """Наївний UTC ISO-рядок (як у datetime.utcnow().isoformat()) з time.time_ns()."""
+    return (_EPOCH + datetime.timedelta(microseconds=ns // 1000)).isoformat()
 
-@dataclass
+
+@dataclass(slots=True)
 class SensorReadings:
     temperature: float
     humidity: float
     co2: float
-    timestamp: datetime.datetime = field(default_factory=datetime.datetime.utcnow)
+    timestamp_ns: int = field(default_factory=time.time_ns)
+
+
+def _actuator_bit(flag: int) -> property:
+    def get(self) -> bool:
+        return bool(self.mask & flag)
+
+    def set(self, on: bool):
+        self.mask = self.mask | flag if on else self.mask & ~flag
+
+    return property(get, set)
 
 
-@dataclass
 class ActuatorState:
-    heater_on: bool = False
-    cooler_on: bool = False
-    humidifier_on: bool = False
-    fan_on: bool = False
+    """Стан механізмів як одна бітова маска; bool-властивості лишено для сумісності."""
+    __slots__ = ("mask",)
+
+    def __init__(self, heater_on: bool = False, cooler_on: bool = False,
+                 humidifier_on: bool = False, fan_on: bool = False):
+        self.mask = (bool(heater_on) * HEATER | bool(cooler_on) * COOLER
+                     | bool(humidifier_on) * HUMIDIFIER | bool(fan_on) * FAN)
+
+    heater_on = _actuator_bit(HEATER)
+    cooler_on = _actuator_bit(COOLER)
+    humidifier_on = _actuator_bit(HUMIDIFIER)
+    fan_on = _actuator_bit(FAN)
+
+    def __eq__(self, other):
+        if not isinstance(other, ActuatorState):
+            return NotImplemented
+        return self.mask == other.mask
+
+    def __repr__(self) -> str:
+        return (f"ActuatorState(heater_on={self.heater_on}, cooler_on={self.cooler_on}, "
+                f"humidifier_on={self.humidifier_on}, fan_on={self.fan_on})")
+
+
+def _step_core_py(temp, hum, co2, heater, cooler, humidifier, fan, dt,
+                  rnd_t, rnd_h, rnd_c,
+                  outside_temp, heater_power, cooler_power, humidifier_power, fan_exchange):
+    temp += (outside_temp - temp) * 0.01 * dt
+    if heater:
+        temp += heater_power * dt
+    if cooler:
+        temp -= cooler_power * dt
+
+    hum += (40.0 - hum) * 0.005 * dt
+    if humidifier:
+        hum += humidifier_power * dt
+    hum = max(0.0, min(100.0, hum))
+
+    co2 += 2.0 * dt
+    if fan:
+        co2 += (400.0 - co2) * fan_exchange * dt
+    temp += rnd_t * dt
+    hum += rnd_h * dt
+    co2 += rnd_c * dt
+    return temp, hum, co2
+
+
+# numba.njit тут не використовується: диспетчеризація 16 скалярів у JIT-функцію
+# дорожча за саму арифметику (step ~1.1 мкс проти ~0.9 мкс на чистому Python)
+_step_core = _step_core_py
+
+# сигнатура AOT-експорту step_core у compile_kernels.py
+KERNEL_SIGNATURE = "UniTuple(f8, 3)(f8, f8, f8, b1, b1, b1, b1, f8, f8, f8, f8, f8, f8, f8, f8, f8)"
+
+
+def _kernel_version() -> int:
+    """Хеш коду _step_core_py і сигнатури; зберігається в AOT-модулі для перевірки актуальності."""
+    src = inspect.getsource(_step_core_py) + KERNEL_SIGNATURE
+    return int.from_bytes(hashlib.sha256(src.encode()).digest()[:7], "big")
+
+
+try:
+    # AOT-збірка з compile_kernels.py; модуль, зібраний зі старої версії ядра, ігнорується
+    import microclimate_kernels
+    if microclimate_kernels.kernel_version() == _kernel_version():
+        _step_core = microclimate_kernels.step_core
+except (ImportError, AttributeError, OSError):
+    pass
 
 
 class SensorSimulator:
@@ -60,36 +168,107 @@ class SensorSimulator:
         self._cooler_power = 1.0
         self._humidifier_power = 2.0
         self._fan_exchange = 0.3
+        self.latest: Optional[SensorReadings] = None
+        if np is not None:
+            # сід береться з random, тож random.seed() і далі дає відтворюваний шум
+            self._rng = np.random.default_rng(random.getrandbits(64))
+            self._step_noise_buf = self._read_noise_buf = []
+            self._step_noise_idx = self._read_noise_idx = NOISE_CHUNK
+
+    def _step_noise(self):
+        if np is None:
+            return random.uniform(-0.05, 0.05), random.uniform(-0.1, 0.1), random.uniform(-1.0, 1.0)
+        i = self._step_noise_idx
+        if i == NOISE_CHUNK:
+            buf = self._rng.uniform(-1.0, 1.0, (NOISE_CHUNK, 3)) * np.array([0.05, 0.1, 1.0])
+            self._step_noise_buf = buf.tolist()
+            i = 0
+        self._step_noise_idx = i + 1
+        return self._step_noise_buf[i]
+
+    def _read_noise(self):
+        if np is None:
+            return random.gauss(0.0, 0.05), random.gauss(0.0, 0.2), random.gauss(0.0, 2.0)
+        i = self._read_noise_idx
+        if i == NOISE_CHUNK:
+            buf = self._rng.standard_normal((NOISE_CHUNK, 3)) * np.array([0.05, 0.2, 2.0])
+            self._read_noise_buf = buf.tolist()
+            i = 0
+        self._read_noise_idx = i + 1
+        return self._read_noise_buf[i]
 
     def step(self, actuators: ActuatorState, dt: float = 1.0):
-        loss = (self._outside_temp - self._temp) * 0.01 * dt
-        self._temp += loss
-
-        if actuators.heater_on:
-            self._temp += self._heater_power * dt
-        if actuators.cooler_on:
-            self._temp -= self._cooler_power * dt
-
-        self._humidity += (40.0 - self._humidity) * 0.005 * dt
-        if actuators.humidifier_on:
-            self._humidity += self._humidifier_power * dt
-        self._humidity = max(0.0, min(100.0, self._humidity))
-
-        self._co2 += 2.0 * dt
-        if actuators.fan_on:
-            self._co2 += (400.0 - self._co2) * self._fan_exchange * dt
-        self._temp += random.uniform(-0.05, 0.05) * dt
-        self._humidity += random.uniform(-0.1, 0.1) * dt
-        self._co2 += random.uniform(-1.0, 1.0) * dt
+        m = actuators.mask
+        rnd_t, rnd_h, rnd_c = self._step_noise()
+        self._temp, self._humidity, self._co2 = _step_core(
+            self._temp, self._humidity, self._co2,
+            bool(m & HEATER), bool(m & COOLER), bool(m & HUMIDIFIER), bool(m & FAN),
+            dt, rnd_t, rnd_h, rnd_c,
+            self._outside_temp, self._heater_power, self._cooler_power,
+            self._humidifier_power, self._fan_exchange,
+        )
 
     def read(self) -> SensorReadings:
-        noise_temp = random.gauss(0.0, 0.05)
-        noise_hum = random.gauss(0.0, 0.2)
-        noise_co2 = random.gauss(0.0, 2.0)
-        return SensorReadings(
-            temperature=round(self._temp + noise_temp, 2),
-            humidity=round(self._humidity + noise_hum, 2),
-            co2=round(self._co2 + noise_co2, 1),
+        return self.read_into(SensorReadings(0.0, 0.0, 0.0))
+
+    def read_into(self, out: SensorReadings) -> SensorReadings:
+        # без round(): точність задається форматом при виводі (CSVLogger, status_printer)
+        noise_temp, noise_hum, noise_co2 = self._read_noise()
+        out.temperature = self._temp + noise_temp
+        out.humidity = self._humidity + noise_hum
+        out.co2 = self._co2 + noise_co2
+        out.timestamp_ns = time.time_ns()
+        return out
+
+
+class BatchSensorSimulator:
+    """Та сама фізика, що й у SensorSimulator, але для n кімнат одночасно (потрібен numpy)."""
+
+    def __init__(self, n: int,
+                 initial_temp: float = 20.0,
+                 initial_humidity: float = 45.0,
+                 initial_co2: float = 600.0,
+                 seed: Optional[int] = None):
+        if np is None:
+            raise ImportError("BatchSensorSimulator requires numpy")
+        self.n = n
+        self.temp = np.empty(n, dtype=np.float64)
+        self.humidity = np.empty(n, dtype=np.float64)
+        self.co2 = np.empty(n, dtype=np.float64)
+        self.temp.fill(initial_temp)
+        self.humidity.fill(initial_humidity)
+        self.co2.fill(initial_co2)
+        self._rng = np.random.default_rng(seed)
+        self._outside_temp = 5.0
+        self._heater_power = 0.8
+        self._cooler_power = 1.0
+        self._humidifier_power = 2.0
+        self._fan_exchange = 0.3
+
+    def step(self, heater_mask, cooler_mask, humidifier_mask, fan_mask, dt: float = 1.0):
+        n = self.n
+        rng = self._rng
+        self.temp += (self._outside_temp - self.temp) * 0.01 * dt
+        self.temp += np.where(heater_mask, self._heater_power * dt, 0.0)
+        self.temp -= np.where(cooler_mask, self._cooler_power * dt, 0.0)
+
+        self.humidity += (40.0 - self.humidity) * 0.005 * dt
+        self.humidity += np.where(humidifier_mask, self._humidifier_power * dt, 0.0)
+        np.clip(self.humidity, 0.0, 100.0, out=self.humidity)
+
+        self.co2 += 2.0 * dt
+        self.co2 += np.where(fan_mask, (400.0 - self.co2) * self._fan_exchange * dt, 0.0)
+        self.temp += rng.uniform(-0.05, 0.05, size=n) * dt
+        self.humidity += rng.uniform(-0.1, 0.1, size=n) * dt
+        self.co2 += rng.uniform(-1.0, 1.0, size=n) * dt
+
+    def read(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        n = self.n
+        rng = self._rng
+        return (
+            np.round(self.temp + rng.normal(0.0, 0.05, size=n), 2),
+            np.round(self.humidity + rng.normal(0.0, 0.2, size=n), 2),
+            np.round(self.co2 + rng.normal(0.0, 2.0, size=n), 1),
         )
 
 
@@ -98,76 +277,125 @@ class MicroclimateController:
     def __init__(self, setpoints: Dict[str, float], hysteresis: Dict[str, float]):
         self.setpoints = dict(setpoints)
         self.hysteresis = dict(hysteresis)
+        # незмінні представлення для get_status: відображають зміни без копіювання
+        self._setpoints_ro = MappingProxyType(self.setpoints)
+        self._hysteresis_ro = MappingProxyType(self.hysteresis)
         self.actuators = ActuatorState()
         self.last_action: Dict[str, Optional[datetime.datetime]] = {}
+        self._t_lo, self._t_hi = self._band("temperature")
+        self._h_lo, self._h_hi = self._band("humidity")
+        self._c_lo, self._c_hi = self._band("co2")
+
+    def _band(self, name: str) -> Tuple[float, float]:
+        sp = self.setpoints[name]
+        h = self.hysteresis[name]
+        return sp - h, sp + h
 
     def update(self, readings: SensorReadings):
-        t_sp = self.setpoints["temperature"]
-        t_h = self.hysteresis["temperature"]
-        if readings.temperature < t_sp - t_h:
-            self.actuators.heater_on = True
-            self.actuators.cooler_on = False
-        elif readings.temperature > t_sp + t_h:
-            self.actuators.cooler_on = True
-            self.actuators.heater_on = False
-        else:
-            self.actuators.heater_on = False
-            self.actuators.cooler_on = False
-
-        h_sp = self.setpoints["humidity"]
-        h_h = self.hysteresis["humidity"]
-        if readings.humidity < h_sp - h_h:
-            self.actuators.humidifier_on = True
-        elif readings.humidity > h_sp + h_h:
-            self.actuators.humidifier_on = False
-        co2_sp = self.setpoints["co2"]
-        co2_h = self.hysteresis["co2"]
-        if readings.co2 > co2_sp + co2_h:
-            self.actuators.fan_on = True
-        elif readings.co2 < co2_sp - co2_h:
-            self.actuators.fan_on = False
+        t = readings.temperature
+        h = readings.humidity
+        c = readings.co2
+        m = self.actuators.mask
+        # все вимкнено і жоден поріг увімкнення не перетнуто -- маска лишиться нульовою
+        if not m and self._t_lo <= t <= self._t_hi and h >= self._h_lo and c <= self._c_hi:
+            return
+        # умовні вирази замість множення bool на біт: у CPython це швидше
+        mask = HEATER if t < self._t_lo else (COOLER if t > self._t_hi else 0)
+        # зволожувач і вентилятор зберігають стан всередині гістерезису
+        if h < self._h_lo:
+            mask |= HUMIDIFIER
+        elif h <= self._h_hi:
+            mask |= m & HUMIDIFIER
+        if c > self._c_hi:
+            mask |= FAN
+        elif c >= self._c_lo:
+            mask |= m & FAN
+        self.actuators.mask = mask
 
     def set_setpoint(self, name: str, value: float):
         if name in self.setpoints:
             self.setpoints[name] = value
         else:
             raise KeyError(f"No such setpoint: {name}")
+        if name == "temperature":
+            self._t_lo, self._t_hi = self._band(name)
+        elif name == "humidity":
+            self._h_lo, self._h_hi = self._band(name)
+        else:
+            self._c_lo, self._c_hi = self._band(name)
 
     def get_status(self) -> Dict:
         return {
-            "setpoints": dict(self.setpoints),
-            "hysteresis": dict(self.hysteresis),
+            "setpoints": self._setpoints_ro,
+            "hysteresis": self._hysteresis_ro,
             "actuators": self.actuators,
         }
 
 
 class CSVLogger:
+    # елементи для log/log_many: (timestamp_ns, temperature, humidity, co2, mask)
+    # фіксована схема з числових полів -- лапки не потрібні, csv.writer обходимо;
+    # рядки закінчуються \r\n, як у csv.writer за замовчуванням
+    HEADER = "timestamp,temperature,humidity,co2,heater,cooler,humidifier,fan\r\n"
+
     def __init__(self, filename: str = CSV_LOGFILE):
         self.filename = filename
-        # write header
-        with open(self.filename, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "timestamp", "temperature", "humidity", "co2",
-                "heater", "cooler", "humidifier", "fan"
-            ])
-
-    def log(self, readings: SensorReadings, actuators: ActuatorState):
-        with open(self.filename, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                readings.timestamp.isoformat(),
-                readings.temperature,
-                readings.humidity,
-                readings.co2,
-                int(actuators.heater_on),
-                int(actuators.cooler_on),
-                int(actuators.humidifier_on),
-                int(actuators.fan_on),
-            ])
-
-
-def start_cli(controller: MicroclimateController, stop_event: threading.Event):
+        flags = (os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+                 | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0))
+        self._fd = os.open(self.filename, flags, 0o644)
+        self._writev([self.HEADER.encode("ascii")])
+
+    def _writev(self, bufs):
+        # один writev на пакет; у Windows немає os.writev -- склеюємо і пишемо одним write
+        for i in range(0, len(bufs), IOV_MAX):
+            chunk = bufs[i:i + IOV_MAX]
+            if hasattr(os, "writev"):
+                n = os.writev(self._fd, chunk)
+                if n == sum(map(len, chunk)):
+                    continue
+                rest = b"".join(chunk)[n:]
+            else:
+                rest = b"".join(chunk)
+            while rest:
+                rest = rest[os.write(self._fd, rest):]
+
+    def log(self, readings: SensorReadings, mask: int):
+        self.log_many([(readings.timestamp_ns, readings.temperature,
+                        readings.humidity, readings.co2, mask)])
+
+    def log_many(self, items):
+        if not items:
+            return
+        self._writev([
+            f"{_iso_utc(ns)},{t:.2f},{h:.2f},{c:.1f},"
+            f"{m & 1},{(m >> 1) & 1},{(m >> 2) & 1},{(m >> 3) & 1}\r\n".encode("ascii")
+            for ns, t, h, c, m in items
+        ])
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+async def _readline() -> str:
+    # читання stdin у daemon-потоці: незавершений readline не блокує вихід з програми
+    # (потік asyncio.to_thread тримав би shutdown_default_executor до натискання Enter)
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def reader():
+        line = sys.stdin.readline()
+        try:
+            loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(line))
+        except RuntimeError:
+            pass  # цикл подій уже закрито
+
+    threading.Thread(target=reader, daemon=True).start()
+    return await fut
+
+
+async def cli_task(controller: MicroclimateController, stop_event: asyncio.Event):
     """
     Підтримувані команди:
       status
@@ -178,10 +406,11 @@ def start_cli(controller: MicroclimateController, stop_event: threading.Event):
     """
     print("CLI запущено. Введіть 'help' для списку команд.")
     while not stop_event.is_set():
-        try:
-            raw = input("> ").strip()
-        except EOFError:
+        print("> ", end="", flush=True)
+        raw = await _readline()
+        if not raw:
             break
+        raw = raw.strip()
         if not raw:
             continue
         parts = raw.split()
@@ -191,8 +420,8 @@ def start_cli(controller: MicroclimateController, stop_event: threading.Event):
             print("Параметри для set: temperature, humidity, co2")
         elif cmd == "status":
             st = controller.get_status()
-            print("Setpoints:", st["setpoints"])
-            print("Hysteresis:", st["hysteresis"])
+            print("Setpoints:", dict(st["setpoints"]))
+            print("Hysteresis:", dict(st["hysteresis"]))
             print("Actuators:", st["actuators"])
         elif cmd == "set" and len(parts) == 3:
             param = parts[1].lower()
@@ -214,92 +443,93 @@ def start_cli(controller: MicroclimateController, stop_event: threading.Event):
             print("Невідома команда. help -> довідка.")
 
 
-async def sensor_task(sim: SensorSimulator, controller: MicroclimateController,
-                      readings_queue: asyncio.Queue, stop_event: threading.Event):
-    while not stop_event.is_set():
+async def sense_and_control(sim: SensorSimulator, controller: MicroclimateController,
+                            log_queue: asyncio.Queue):
+    r = SensorReadings(0.0, 0.0, 0.0)
+    while True:
         sim.step(controller.actuators, dt=SENSOR_PERIOD)
-        r = sim.read()
-        r.timestamp = datetime.datetime.utcnow()
-        await readings_queue.put(r)
+        sim.latest = sim.read_into(r)
+        controller.update(r)
+        # r перезаписується на кожному такті, тому в лог іде плоский кортеж значень
+        await log_queue.put((r.timestamp_ns, r.temperature, r.humidity, r.co2,
+                             controller.actuators.mask))
         await asyncio.sleep(SENSOR_PERIOD)
 
 
-async def controller_task(controller: MicroclimateController,
-                          readings_queue: asyncio.Queue,
-                          log_queue: asyncio.Queue,
-                          stop_event: threading.Event):
-    while not stop_event.is_set():
-        try:
-            r = await asyncio.wait_for(readings_queue.get(), timeout=CONTROL_PERIOD)
-            controller.update(r)
-            await log_queue.put((r, controller.actuators))
-        except asyncio.TimeoutError:
-            await asyncio.sleep(0.01)
+async def logger_task(csv_logger: CSVLogger, log_queue: asyncio.Queue):
+    # None у черзі -- сигнал завершення від run_simulation
+    last_written = time.monotonic()
+    batch = []
+    done = False
+    try:
+        while not done:
+            items = [await log_queue.get()]
+            try:
+                while True:
+                    items.append(log_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+            if items[-1] is None:
+                items.pop()
+                done = True
+            batch.extend(items)
+            if batch and (done or time.monotonic() - last_written >= LOG_PERIOD):
+                # пакет відчіплюється до await: якщо задачу скасують під час запису,
+                # потік допише його сам, а finally не запише ті ж рядки вдруге
+                pending, batch = batch, []
+                await asyncio.to_thread(csv_logger.log_many, pending)
+                last_written = time.monotonic()
+    finally:
+        if batch:
+            csv_logger.log_many(batch)
 
 
-async def logger_task(csv_logger: CSVLogger, log_queue: asyncio.Queue, stop_event: threading.Event):
-    last_written = datetime.datetime.utcnow()
-    buffer = []
-    while not stop_event.is_set() or not log_queue.empty():
-        try:
-            item = await asyncio.wait_for(log_queue.get(), timeout=1.0)
-            buffer.append(item)
-        except asyncio.TimeoutError:
-            item = None
-        if (datetime.datetime.utcnow() - last_written).total_seconds() >= LOG_PERIOD and buffer:
-            for r, act in buffer:
-                csv_logger.log(r, act)
-            buffer.clear()
-            last_written = datetime.datetime.utcnow()
-        await asyncio.sleep(0.01)
-    for r, act in buffer:
-        csv_logger.log(r, act)
-
-
-async def status_printer(readings_queue: asyncio.Queue, controller: MicroclimateController,
-                         stop_event: threading.Event):
-    last_reading: Optional[SensorReadings] = None
-    while not stop_event.is_set():
-        try:
-            last_reading = readings_queue.get_nowait()
-            readings_queue.put_nowait(last_reading)
-        except asyncio.QueueEmpty:
-            pass
+async def status_printer(sim: SensorSimulator, controller: MicroclimateController):
+    while True:
+        last_reading = sim.latest
         if last_reading:
-            ts = last_reading.timestamp.isoformat()
-            print(f"[{ts}] T={last_reading.temperature}°C H={last_reading.humidity}% CO2={last_reading.co2}ppm -> Actuators: {controller.actuators}")
+            ts = _iso_utc(last_reading.timestamp_ns)
+            print(f"[{ts}] T={last_reading.temperature:.2f}°C H={last_reading.humidity:.2f}% CO2={last_reading.co2:.1f}ppm -> Actuators: {controller.actuators}")
         await asyncio.sleep(5.0)
 
 
 def run_simulation(run_seconds: Optional[int] = None):
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     sim = SensorSimulator(initial_temp=19.5, initial_humidity=45.0, initial_co2=650.0)
     controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
     csv_logger = CSVLogger(CSV_LOGFILE)
 
-    stop_event = threading.Event()
-    readings_queue: asyncio.Queue = asyncio.Queue(maxsize=10)
+    stop_event = asyncio.Event()
     log_queue: asyncio.Queue = asyncio.Queue(maxsize=100)
 
-    cli_thread = threading.Thread(target=start_cli, args=(controller, stop_event), daemon=True)
-    cli_thread.start()
-
     async def main_loop():
-        tasks = [
-            asyncio.create_task(sensor_task(sim, controller, readings_queue, stop_event)),
-            asyncio.create_task(controller_task(controller, readings_queue, log_queue, stop_event)),
-            asyncio.create_task(logger_task(csv_logger, log_queue, stop_event)),
-            asyncio.create_task(status_printer(readings_queue, controller, stop_event)),
+        producers = [
+            asyncio.create_task(sense_and_control(sim, controller, log_queue)),
+            asyncio.create_task(status_printer(sim, controller)),
+            asyncio.create_task(cli_task(controller, stop_event)),
         ]
+        logger = asyncio.create_task(logger_task(csv_logger, log_queue))
         if run_seconds is not None:
-            await asyncio.sleep(run_seconds)
-            stop_event.set()
-        await asyncio.gather(*tasks, return_exceptions=True)
+            asyncio.get_running_loop().call_later(run_seconds, stop_event.set)
+        await stop_event.wait()
+        for task in producers:
+            task.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+        await log_queue.put(None)
+        await logger
+        csv_logger.close()
 
     try:
         asyncio.run(main_loop())
     except KeyboardInterrupt:
-        stop_event.set()
+        pass
     finally:
+        csv_logger.close()
         print("Симуляція завершена.")
 
 
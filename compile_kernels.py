@@ -0,0 +1,28 @@
+"""
+AOT-компіляція ядра фізики SensorSimulator у модуль microclimate_kernels.
+Запуск під час збірки (потрібні numba і numpy): python compile_kernels.py
+Без цього модуля Microclimate_sim використовує чисту Python-версію ядра.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from Microclimate_sim import KERNEL_SIGNATURE, _kernel_version, _step_core_py
+
+KERNEL_VERSION = _kernel_version()
+
+
+def kernel_version():
+    return KERNEL_VERSION
+
+
+cc = CC("microclimate_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.verbose = True
+
+cc.export("step_core", KERNEL_SIGNATURE)(_step_core_py)
+cc.export("kernel_version", "i8()")(kernel_version)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,4 +1,4 @@
-from Microclimate_sim import MicroclimateController, SensorReadings, HYSTERESIS, DEFAULT_SETPOINTS
+from Microclimate_sim import MicroclimateController, SensorReadings, ActuatorState, HYSTERESIS, DEFAULT_SETPOINTS
 
 def test_controller_turns_on_heater_and_off_cooler():
     controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
@@ -12,3 +12,72 @@ def test_controller_turns_on_fan_for_high_co2():
     r = SensorReadings(temperature=22.0, humidity=50.0, co2=2000.0)
     controller.update(r)
     assert controller.actuators.fan_on is True
+
+def test_controller_status_reflects_setpoint_changes():
+    controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
+    st = controller.get_status()
+    controller.set_setpoint("temperature", 25.0)
+    assert st["setpoints"]["temperature"] == 25.0
+    assert DEFAULT_SETPOINTS["temperature"] == 22.0
+
+def test_actuator_state_coerces_truthy_flags_to_single_bit():
+    act = ActuatorState(heater_on=2, fan_on=1)
+    assert act.heater_on is True
+    assert act.cooler_on is False
+    assert act.fan_on is True
+
+def test_controller_humidifier_holds_state_inside_band():
+    controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
+    controller.update(SensorReadings(temperature=22.0, humidity=40.0, co2=800.0))
+    assert controller.actuators.humidifier_on is True
+    controller.update(SensorReadings(temperature=22.0, humidity=52.0, co2=800.0))
+    assert controller.actuators.humidifier_on is True
+    controller.update(SensorReadings(temperature=22.0, humidity=54.0, co2=800.0))
+    assert controller.actuators.humidifier_on is False
+    controller.update(SensorReadings(temperature=22.0, humidity=48.0, co2=800.0))
+    assert controller.actuators.humidifier_on is False
+
+def test_controller_fan_holds_state_inside_band():
+    controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
+    controller.update(SensorReadings(temperature=22.0, humidity=50.0, co2=900.0))
+    assert controller.actuators.fan_on is True
+    controller.update(SensorReadings(temperature=22.0, humidity=50.0, co2=760.0))
+    assert controller.actuators.fan_on is True
+    controller.update(SensorReadings(temperature=22.0, humidity=50.0, co2=740.0))
+    assert controller.actuators.fan_on is False
+    controller.update(SensorReadings(temperature=22.0, humidity=50.0, co2=840.0))
+    assert controller.actuators.fan_on is False
+
+def test_controller_set_setpoint_moves_band():
+    controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
+    controller.set_setpoint("temperature", 25.0)
+    assert (controller._t_lo, controller._t_hi) == (25.0 - 0.7, 25.0 + 0.7)
+    controller.set_setpoint("humidity", 60.0)
+    assert (controller._h_lo, controller._h_hi) == (57.0, 63.0)
+    controller.set_setpoint("co2", 1000.0)
+    assert (controller._c_lo, controller._c_hi) == (950.0, 1050.0)
+    controller.update(SensorReadings(temperature=23.0, humidity=58.0, co2=1000.0))
+    assert controller.actuators.heater_on is True
+
+def test_controller_fast_path_leaves_mask_untouched():
+    class RecordingActuators:
+        def __init__(self):
+            self.writes = 0
+            self._mask = 0
+
+        @property
+        def mask(self):
+            return self._mask
+
+        @mask.setter
+        def mask(self, value):
+            self.writes += 1
+            self._mask = value
+
+    controller = MicroclimateController(setpoints=DEFAULT_SETPOINTS, hysteresis=HYSTERESIS)
+    controller.actuators = RecordingActuators()
+    controller.update(SensorReadings(temperature=22.0, humidity=60.0, co2=700.0))
+    assert controller.actuators.writes == 0
+    assert controller.actuators.mask == 0
+    controller.update(SensorReadings(temperature=15.0, humidity=50.0, co2=800.0))
+    assert controller.actuators.writes == 1
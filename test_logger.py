@@ -0,0 +1,81 @@
+import asyncio
+import csv
+import os
+import threading
+import time
+import pytest
+import Microclimate_sim
+from Microclimate_sim import CSVLogger, ActuatorState, logger_task
+
+def test_logger_log_many_writes_all_rows(tmp_path):
+    path = tmp_path / "log.csv"
+    logger = CSVLogger(str(path))
+    ns = time.time_ns()
+    items = [
+        (ns, 21.5, 48.0, 700.0, ActuatorState(heater_on=True).mask),
+        (ns, 22.5, 52.0, 900.0, ActuatorState(fan_on=True).mask),
+    ]
+    logger.log_many(items)
+    logger.close()
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "timestamp"
+    assert len(rows) == 3
+    assert rows[1][1:] == ["21.50", "48.00", "700.0", "1", "0", "0", "0"]
+    assert rows[2][1:] == ["22.50", "52.00", "900.0", "0", "0", "0", "1"]
+
+def test_logger_task_cancelled_mid_flush_writes_rows_once(tmp_path):
+    path = tmp_path / "log.csv"
+    logger = CSVLogger(str(path))
+    started = threading.Event()
+    release = threading.Event()
+    log_many = logger.log_many
+
+    def slow_log_many(items):
+        started.set()
+        release.wait(5)
+        log_many(items)
+
+    logger.log_many = slow_log_many
+
+    async def scenario():
+        queue = asyncio.Queue()
+        for i in range(3):
+            queue.put_nowait((time.time_ns(), 20.0 + i, 50.0, 800.0, 0))
+        queue.put_nowait(None)
+        task = asyncio.create_task(logger_task(logger, queue))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        release.set()
+
+    asyncio.run(scenario())
+    logger.close()
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 4
+
+def test_logger_log_many_splits_batches_over_iov_max(tmp_path):
+    path = tmp_path / "log.csv"
+    logger = CSVLogger(str(path))
+    n = Microclimate_sim.IOV_MAX * 2 + 3
+    logger.log_many([(time.time_ns(), 21.0, 50.0, 800.0, i & 15) for i in range(n)])
+    logger.close()
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == n + 1
+    assert [int(r[4]) for r in rows[1:]] == [i & 1 for i in range(n)]
+
+def test_logger_finishes_short_writev_with_write(tmp_path, monkeypatch):
+    if not hasattr(os, "writev"):
+        pytest.skip("os.writev not available")
+    monkeypatch.setattr(Microclimate_sim, "IOV_MAX", 4)
+    monkeypatch.setattr(os, "writev", lambda fd, bufs: os.write(fd, bufs[0][:5]))
+    path = tmp_path / "log.csv"
+    logger = CSVLogger(str(path))
+    logger.log_many([(time.time_ns(), 20.0 + i, 50.0, 800.0, 0) for i in range(10)])
+    logger.close()
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 11
+    assert [r[1] for r in rows[1:]] == [f"{20.0 + i:.2f}" for i in range(10)]
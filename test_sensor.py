@@ -1,5 +1,6 @@
 import random
-from Microclimate_sim import SensorSimulator, ActuatorState
+import pytest
+from Microclimate_sim import SensorSimulator, ActuatorState, BatchSensorSimulator
 
 def test_sensor_step_temperature_and_humidity_direction():
     random.seed(0)
@@ -9,3 +10,28 @@ def test_sensor_step_temperature_and_humidity_direction():
     r = sim.read()
     assert r.temperature > 10.0 - 1.0
     assert r.humidity >= 20.0
+
+def test_batch_sensor_step_matches_actuator_masks():
+    np = pytest.importorskip("numpy")
+    sim = BatchSensorSimulator(2, initial_temp=10.0, initial_humidity=20.0, initial_co2=500.0, seed=0)
+    on = np.array([True, False])
+    off = np.zeros(2, dtype=bool)
+    sim.step(on, off, on, off, dt=1.0)
+    t, h, c = sim.read()
+    assert t.shape == h.shape == c.shape == (2,)
+    assert t[0] > t[1]
+    assert h[0] > h[1]
+
+def test_stale_aot_kernel_is_ignored(monkeypatch):
+    import importlib.util
+    import sys
+    import types
+    import Microclimate_sim
+    stale = types.ModuleType("microclimate_kernels")
+    stale.kernel_version = lambda: Microclimate_sim._kernel_version() + 1
+    stale.step_core = lambda *args: (0.0, 0.0, 0.0)
+    monkeypatch.setitem(sys.modules, "microclimate_kernels", stale)
+    spec = importlib.util.spec_from_file_location("microclimate_sim_fresh", Microclimate_sim.__file__)
+    fresh = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fresh)
+    assert fresh._step_core is fresh._step_core_py